@@ -0,0 +1,32 @@
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+def tessellation_triangles(edges: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """Recover the triangles of a face mesh tessellation from its edge set"""
+    neighbors: Dict[int, set] = {}
+    for a, b in edges:
+        neighbors.setdefault(a, set()).add(b)
+        neighbors.setdefault(b, set()).add(a)
+    
+    # Every triangle is a 3-cycle of edges; emit each once, smallest index first
+    triangles = [
+        (a, b, c)
+        for a in sorted(neighbors)
+        for b in sorted(n for n in neighbors[a] if n > a)
+        for c in sorted(n for n in neighbors[a] & neighbors[b] if n > b)
+    ]
+    
+    # A 3-cycle whose edges all border two real faces already is a separating
+    # triangle closing over a hole, not a face of the mesh
+    edge_use = Counter(
+        edge for a, b, c in triangles for edge in ((a, b), (a, c), (b, c))
+    )
+    triangles = [
+        (a, b, c)
+        for a, b, c in triangles
+        if min(edge_use[(a, b)], edge_use[(a, c)], edge_use[(b, c)]) <= 2
+    ]
+    return np.array(triangles, dtype=np.int32).reshape(-1, 3)
@@ -0,0 +1,37 @@
+import hashlib
+
+import numpy as np
+from PIL import Image
+
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+
+def hash_image_pixels(image: Image.Image) -> str:
+    """Hash an image's mode, shape, palette and raw pixels into a 32-character hex digest"""
+    # Stream the raw pixel buffer into the hash without copying it or
+    # PNG-encoding the image first
+    pixels = np.ascontiguousarray(np.asarray(image))
+    
+    # Palette images store indices, so the pixels alone do not determine the
+    # colours; the mode, palette and transparency must be part of the hash
+    header = repr((
+        image.mode,
+        pixels.shape,
+        image.getpalette(),
+        image.info.get("transparency")
+    )).encode()
+    
+    # BLAKE3 hashes at memory speed with SIMD and multiple threads;
+    # the stdlib's BLAKE2b is the fallback
+    if BLAKE3_AVAILABLE:
+        hasher = blake3(header, max_threads=blake3.AUTO)
+        hasher.update(memoryview(pixels))
+        return hasher.hexdigest(length=16)
+    
+    hasher = hashlib.blake2b(header, digest_size=16)
+    hasher.update(memoryview(pixels))
+    return hasher.hexdigest()
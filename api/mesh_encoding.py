@@ -0,0 +1,28 @@
+import base64
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    # SIMD base64 codec; the stdlib encoder is used when it is not installed
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+
+def b64encode_str(data) -> str:
+    """Base64-encode a bytes-like object to an ASCII string"""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode('ascii')
+
+
+def encode_fp16_buffer(array) -> Dict[str, Any]:
+    """Pack an array as a base64 little-endian float16 buffer"""
+    half = np.ascontiguousarray(array, dtype='<f2')
+    return {
+        "dtype": "float16",
+        "shape": list(half.shape),
+        "data": b64encode_str(half)
+    }
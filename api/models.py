@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any, List
 from enum import Enum
 
@@ -10,17 +10,22 @@ class ProcessingStatus(str, Enum):
 class Avatar3DModel(BaseModel):
     """3D Avatar model data structure"""
     
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
     # Basic info
     id: str
     created_at: str
     
-    # Mesh data
-    vertices: List[List[float]]
-    faces: List[List[int]]
+    # Mesh data (untyped lists: validating every vertex component is
+    # too costly for meshes with thousands of points)
+    vertices: list = []  # [[x, y, z], ...], empty when sent as mesh_buffers
+    faces: list  # [[a, b, c], ...]
+    uvs: list = []  # [[u, v], ...]
     textures: Dict[str, str]  # Base64 encoded textures
+    mesh_buffers: Optional[Dict[str, Any]] = None  # Base64 float16 vertex/blend shape buffers
     
     # Animation data
-    blend_shapes: Dict[str, List[float]]
+    blend_shapes: Dict[str, list] = {}
     skeleton: Optional[Dict[str, Any]]
     animations: List[Dict[str, Any]]
     
@@ -60,3 +65,7 @@ class UserFeedback(BaseModel):
     rating: int  # 1-5 stars
     comments: Optional[str]
     issues: List[str]
+
+# Build validators eagerly at import rather than on first use
+for _model in (Avatar3DModel, ProcessingRequest, ProcessingResponse, AvatarMetrics, UserFeedback):
+    _model.model_rebuild()
@@ -1,12 +1,13 @@
 import asyncio
-import base64
-import hashlib
 import json
 import logging
 import numpy as np
 import os
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from PIL import Image, ImageEnhance, ImageFilter
 from typing import Dict, List, Optional, Tuple, Any
@@ -24,16 +25,128 @@ except ImportError:
     MEDIAPIPE_AVAILABLE = False
     print("MediaPipe not available, using fallback processing")
 
+from .face_topology import tessellation_triangles
+from .image_hash import hash_image_pixels
+from .mesh_encoding import b64encode_str, encode_fp16_buffer
 from .models import Avatar3DModel, ProcessingStatus, AvatarMetrics
+from .texture_store import texture_store
 
 logger = logging.getLogger(__name__)
 
+# Normalized MediaPipe landmark centre and scale into model space
+_LANDMARK_CENTER = np.array([0.5, 0.5, 0.0])
+_LANDMARK_SCALE = np.array([2.0, 2.0, 0.5])
+
+# Longest side of the copy MediaPipe runs on; FaceMesh crops the face to
+# 192x192 internally, so more pixels do not improve the landmarks
+_DETECTION_MAX_SIZE = 256
+
+# Maximum per-axis blend shape landmark movement
+_BLEND_SHAPE_SCALE = np.array([0.002, 0.002, 0.001])
+
+# PIL's ImageFilter.SMOOTH kernel, the blur reference ImageEnhance.Sharpness uses
+_SMOOTH_KERNEL = np.array([
+    [1, 1, 1],
+    [1, 5, 1],
+    [1, 1, 1],
+], dtype=np.float32) / 13.0
+
+_IDENTITY_KERNEL = np.array([
+    [0, 0, 0],
+    [0, 1, 0],
+    [0, 0, 0],
+], dtype=np.float32)
+
+# Photo materials; the skin albedo is replaced by the detected skin tone
+_MATERIAL_TEMPLATE = {
+    "skin": {
+        "albedo": [0.8, 0.7, 0.6, 1.0],
+        "metallic": 0.0,
+        "roughness": 0.7,
+        "subsurface": 0.3,
+        "emission": [0.0, 0.0, 0.0]
+    },
+    "eyes": {
+        "albedo": [0.2, 0.3, 0.4, 1.0],
+        "metallic": 0.0,
+        "roughness": 0.1,
+        "emission": [0.0, 0.0, 0.0]
+    }
+}
+
+_LIGHTING_PARAMS = {
+    "ambient_intensity": 0.2,
+    "directional_intensity": 0.8,
+    "rim_light_intensity": 0.3,
+    "shadow_strength": 0.4,
+    "subsurface_scattering": 0.2
+}
+
+# MediaPipe landmark indices of each facial region
+_FACIAL_REGIONS = {
+    "face_oval": list(range(0, 17)) + [172, 136, 150, 149, 176, 148, 152, 377, 400, 378, 379, 365, 397, 288, 361, 323],
+    "left_eyebrow": [70, 63, 105, 66, 107, 55, 65, 52, 53, 46],
+    "right_eyebrow": [296, 334, 293, 300, 276, 283, 282, 295, 285, 336],
+    "left_eye": [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246],
+    "right_eye": [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398],
+    "nose": [19, 20, 1, 2, 5, 4, 6, 168, 8, 9, 10, 151, 195, 197, 196, 3, 51, 48, 115, 131, 134, 102, 49, 220, 305, 292, 308, 324, 318],
+    "mouth": [61, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95, 78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308, 291, 303, 267, 269, 270, 271, 272]
+}
+
+# MediaPipe ships its canonical face triangulation as an edge set; convert it
+# to triangles once at import rather than per avatar
+if MEDIAPIPE_AVAILABLE:
+    _FACE_TOPOLOGY = tessellation_triangles(mp.solutions.face_mesh.FACEMESH_TESSELATION)
+
+def _build_fallback_mesh() -> Dict[str, Any]:
+    """Build the basic face-shaped mesh used when MediaPipe is unavailable"""
+    # Create simple face-shaped mesh over a 20x20 grid
+    u, v = np.meshgrid(
+        (np.arange(20) / 19.0 - 0.5) * 2,
+        (np.arange(20) / 19.0 - 0.5) * 1.5,
+        indexing='ij'
+    )
+    
+    # Create face-like shape, keeping only points inside the face
+    r = 1.0 - (u*u + v*v*0.7)
+    inside = r > 0
+    vertices = np.stack([u[inside], v[inside], 0.1 * np.sqrt(r[inside])], axis=1)
+    
+    # Generate faces
+    starts = np.arange(max(len(vertices) - 3, 0))
+    faces = np.stack([starts, starts + 1, starts + 2], axis=1)
+    
+    # Planar UV projection of x/y into [0, 1]
+    uvs = (vertices[:, :2] + 1.0) * 0.5
+    
+    return {
+        "vertices": vertices.tolist(),
+        "faces": faces.tolist(),
+        "uvs": uvs.tolist(),
+        "vertex_count": len(vertices),
+        "face_count": len(faces),
+        "mesh_quality": "basic_fallback"
+    }
+
+# Built once at import since the fallback mesh is the same for every photo
+_FALLBACK_MESH = _build_fallback_mesh()
+
 class PhotoProcessor:
     """Real photo-to-3D avatar processor using MediaPipe"""
     
     def __init__(self, settings):
         self.settings = settings
-        self.models_loaded = False
+        self._models_loaded = False
+        self._face_mesh_ready = False
+        # MediaPipe graphs are not reentrant, so each worker thread gets its
+        # own face mesh and detections run in parallel without a shared lock
+        self._face_mesh_local = threading.local()
+        # Worker pool for CPU-bound PIL/NumPy stages so they do not block
+        # the event loop (both release the GIL for large operations)
+        self._executor = ThreadPoolExecutor(max_workers=settings.MAX_CONCURRENT_JOBS)
+        # Recently generated avatars keyed by source image hash (LRU)
+        self._avatar_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._rng = np.random.Generator(np.random.SFC64())
         
         if MEDIAPIPE_AVAILABLE:
             try:
@@ -41,30 +154,50 @@ class PhotoProcessor:
                 self.mp_face_mesh = mp.solutions.face_mesh
                 self.mp_drawing = mp.solutions.drawing_utils
                 
-                # Use CPU-only configuration
-                self.face_mesh = self.mp_face_mesh.FaceMesh(
-                    static_image_mode=True,
-                    max_num_faces=1,
-                    refine_landmarks=True,
-                    min_detection_confidence=0.5
-                )
+                # Build the first face mesh on a worker thread so initialization
+                # failures surface here and that worker reuses it for detections
+                self._executor.submit(self._get_face_mesh).result()
+                self._face_mesh_ready = True
                 
                 # Initialize drawing utilities
                 self.drawing_spec = self.mp_drawing.DrawingSpec(thickness=1, circle_radius=1)
                 
                 logger.info("MediaPipe Face Mesh initialized successfully")
-                self.models_loaded = True
+                self._models_loaded = True
                 
             except Exception as e:
                 logger.error(f"Failed to initialize MediaPipe: {e}")
-                self.models_loaded = False
+                self._models_loaded = False
         else:
             logger.warning("MediaPipe not available, using simplified processing")
-            self.models_loaded = True
+            self._models_loaded = True
     
     def models_loaded(self) -> bool:
         """Check if models are loaded"""
-        return self.models_loaded
+        return self._models_loaded
+    
+    def _create_face_mesh(self):
+        """Create a MediaPipe face mesh using the CPU-only configuration"""
+        return self.mp_face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5
+        )
+    
+    def _get_face_mesh(self):
+        """Get the calling thread's face mesh, creating it on first use"""
+        face_mesh = getattr(self._face_mesh_local, "face_mesh", None)
+        if face_mesh is None:
+            face_mesh = self._create_face_mesh()
+            self._face_mesh_local.face_mesh = face_mesh
+        
+        return face_mesh
+    
+    async def _run_blocking(self, func, *args):
+        """Run a blocking call on the worker pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
     
     async def generate_3d_avatar(self, image: Image.Image) -> Dict[str, Any]:
         """Generate 3D avatar from real photo using facial landmarks"""
@@ -72,11 +205,17 @@ class PhotoProcessor:
             avatar_id = str(uuid.uuid4())
             current_time = datetime.now().isoformat()
             
+            # Hash the source image once; identical uploads reuse the
+            # previously generated avatar and skip all processing
+            image_hash = await self._run_blocking(self._generate_image_hash, image)
+            cached_avatar = self._get_cached_avatar(image_hash)
+            if cached_avatar is not None:
+                return {**cached_avatar, "id": avatar_id, "created_at": current_time}
+            
             # Preprocess the image
             processed_image = await self._preprocess_image(image)
-            image_hash = self._generate_image_hash(processed_image)
             
-            if MEDIAPIPE_AVAILABLE and self.face_mesh:
+            if MEDIAPIPE_AVAILABLE and self._face_mesh_ready:
                 # Extract real facial features using MediaPipe
                 features = await self._extract_real_facial_features(processed_image)
                 
@@ -84,7 +223,7 @@ class PhotoProcessor:
                 mesh_data = await self._generate_realistic_mesh(features, processed_image)
                 
                 # Generate textures from actual photo
-                textures = await self._generate_photo_textures(processed_image, features)
+                textures = await self._generate_photo_textures(processed_image, features, image_hash)
                 
                 # Generate animations based on detected expressions
                 animations = await self._generate_realistic_animations(features)
@@ -93,7 +232,7 @@ class PhotoProcessor:
                 # Fallback to basic processing if MediaPipe unavailable
                 features = await self._extract_basic_features(processed_image)
                 mesh_data = await self._generate_fallback_mesh(processed_image)
-                textures = await self._generate_basic_textures(processed_image)
+                textures = await self._generate_basic_textures(processed_image, image_hash)
                 animations = await self._generate_basic_animations()
             
             avatar_data = {
@@ -101,6 +240,7 @@ class PhotoProcessor:
                 "created_at": current_time,
                 "vertices": mesh_data["vertices"],
                 "faces": mesh_data["faces"],
+                "uvs": mesh_data["uvs"],
                 "textures": textures,
                 "blend_shapes": animations["blend_shapes"],
                 "skeleton": animations.get("skeleton"),
@@ -116,18 +256,78 @@ class PhotoProcessor:
                 }
             }
             
+            await self._pack_mesh_buffers(avatar_data)
+            self._cache_avatar(image_hash, avatar_data)
             return avatar_data
             
         except Exception as e:
             logger.error(f"Avatar generation failed: {e}")
             # Instead of failing, use fallback processing for better user experience
             if "No face detected" in str(e):
-                return await self._generate_fallback_avatar(image, avatar_id, current_time, image_hash)
+                # Cache the fallback too, so resubmitting a photo without a
+                # detectable face skips preprocessing and inference as well
+                avatar_data = await self._generate_fallback_avatar(image, avatar_id, current_time, image_hash)
+                await self._pack_mesh_buffers(avatar_data)
+                self._cache_avatar(image_hash, avatar_data)
+                return avatar_data
             else:
                 raise Exception(f"Processing failed: {str(e)}")
     
+    async def _pack_mesh_buffers(self, avatar_data: Dict[str, Any]) -> None:
+        """Move the mesh and blend shapes into float16 buffers when MESH_ENCODING=fp16"""
+        if self.settings.MESH_ENCODING != "fp16":
+            return
+        
+        # Half-precision binary buffers: a fraction of the JSON float list
+        # size and no per-float parsing on the client
+        avatar_data["mesh_buffers"] = await self._run_blocking(
+            self._encode_mesh_buffers, avatar_data["vertices"], avatar_data["uvs"], avatar_data["blend_shapes"]
+        )
+        avatar_data["vertices"] = []
+        avatar_data["uvs"] = []
+        avatar_data["blend_shapes"] = {}
+    
+    def _encode_mesh_buffers(self, vertices: np.ndarray, uvs: np.ndarray, blend_shapes: Dict[str, List[float]]) -> Dict[str, Any]:
+        """Pack the mesh and blend shapes as float16 buffers (blocking)"""
+        return {
+            "vertices": encode_fp16_buffer(vertices),
+            "uvs": encode_fp16_buffer(uvs),
+            "blend_shapes": {
+                emotion: encode_fp16_buffer(deltas)
+                for emotion, deltas in blend_shapes.items()
+            }
+        }
+    
+    def _get_cached_avatar(self, image_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a previously generated avatar for the same source image"""
+        cached_avatar = self._avatar_cache.get(image_hash)
+        if cached_avatar is None:
+            return None
+        
+        # Avatars whose served textures have been evicted must be regenerated
+        if not self.settings.INLINE_TEXTURES and not all(
+            texture_store.contains(url)
+            for channel, url in cached_avatar["textures"].items()
+            if not channel.endswith("_ref")
+        ):
+            del self._avatar_cache[image_hash]
+            return None
+        
+        self._avatar_cache.move_to_end(image_hash)
+        return cached_avatar
+    
+    def _cache_avatar(self, image_hash: str, avatar_data: Dict[str, Any]):
+        """Remember a generated avatar under its source image hash (LRU)"""
+        self._avatar_cache[image_hash] = avatar_data
+        while len(self._avatar_cache) > self.settings.AVATAR_CACHE_SIZE:
+            self._avatar_cache.popitem(last=False)
+    
     async def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """Preprocess image for optimal face detection"""
+        return await self._run_blocking(self._preprocess_image_sync, image)
+    
+    def _preprocess_image_sync(self, image: Image.Image) -> Image.Image:
+        """Resize and enhance the image (blocking)"""
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
@@ -136,6 +336,9 @@ class PhotoProcessor:
         image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
         
         # Enhance for better face detection
+        if MEDIAPIPE_AVAILABLE:
+            return self._enhance_image(image, sharpness=1.1, contrast=1.05)
+        
         enhancer = ImageEnhance.Sharpness(image)
         image = enhancer.enhance(1.1)
         
@@ -144,38 +347,71 @@ class PhotoProcessor:
         
         return image
     
+    def _enhance_image(self, image: Image.Image, sharpness: float, contrast: float) -> Image.Image:
+        """Apply ImageEnhance-style sharpness and contrast in one OpenCV pass"""
+        pixels = np.asarray(image)
+        
+        # Sharpening blends away from the smoothed image and contrast scales
+        # around the mean luma; both are linear, so fold them into one kernel
+        # plus offset and let filter2D round and saturate once
+        kernel = sharpness * _IDENTITY_KERNEL + (1.0 - sharpness) * _SMOOTH_KERNEL
+        mean = cv2.mean(cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY))[0]
+        
+        enhanced = cv2.filter2D(
+            pixels, -1, contrast * kernel,
+            delta=(1.0 - contrast) * mean,
+            borderType=cv2.BORDER_REPLICATE
+        )
+        
+        return Image.fromarray(enhanced)
+    
     def _generate_image_hash(self, image: Image.Image) -> str:
-        """Generate hash of processed image"""
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_data = img_bytes.getvalue()
-        return hashlib.md5(img_data).hexdigest()
+        """Generate hash of source image"""
+        return hash_image_pixels(image)
     
     async def _extract_real_facial_features(self, image: Image.Image) -> Dict[str, Any]:
         """Extract real facial features using MediaPipe"""
-        await asyncio.sleep(0.5)  # Simulate processing time
+        if self.settings.SIMULATE_LATENCY:
+            await asyncio.sleep(0.5)  # Simulate processing time
         
-        # Convert PIL image to OpenCV format
-        opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        return await self._run_blocking(self._extract_real_facial_features_sync, image)
+    
+    def _extract_real_facial_features_sync(self, image: Image.Image) -> Dict[str, Any]:
+        """Run MediaPipe and analyze the detected landmarks (blocking)"""
+        # The preprocessed image is already RGB, which is what MediaPipe expects;
+        # convert it to an array once and share it with the skin analysis
+        rgb = np.asarray(image)
+        
+        # Detect on a downscaled copy. Landmarks come back normalized, so they
+        # map onto the full-resolution pixels without rescaling
+        h, w = rgb.shape[:2]
+        scale = _DETECTION_MAX_SIZE / max(h, w)
+        detect_rgb = rgb
+        if scale < 1:
+            detect_rgb = cv2.resize(
+                rgb, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA
+            )
         
         # Process with MediaPipe
-        results = self.face_mesh.process(cv2.cvtColor(opencv_image, cv2.COLOR_BGR2RGB))
+        results = self._get_face_mesh().process(detect_rgb)
         
         if not results.multi_face_landmarks:
             raise Exception("No face detected in the image")
         
         face_landmarks = results.multi_face_landmarks[0]
         
-        # Extract 3D coordinates
-        landmarks_3d = []
-        h, w = image.height, image.width
+        # Extract 3D coordinates, streaming them straight into one array
+        landmark_list = face_landmarks.landmark
+        landmarks_3d = np.fromiter(
+            (coord for landmark in landmark_list for coord in (landmark.x, landmark.y, landmark.z)),
+            dtype=np.float64,
+            count=3 * len(landmark_list)
+        ).reshape(-1, 3)
         
-        for landmark in face_landmarks.landmark:
-            # Convert normalized coordinates to image coordinates, then to 3D space
-            x = (landmark.x - 0.5) * 2.0  # [-1, 1] range
-            y = (landmark.y - 0.5) * 2.0  # [-1, 1] range  
-            z = landmark.z * 0.5  # Scale depth appropriately
-            landmarks_3d.append([x, y, z])
+        # Convert normalized coordinates to 3D space: x and y to the [-1, 1]
+        # range, with depth scaled appropriately
+        landmarks_3d -= _LANDMARK_CENTER
+        landmarks_3d *= _LANDMARK_SCALE
         
         # Analyze facial structure
         features = {
@@ -183,16 +419,14 @@ class PhotoProcessor:
             "face_geometry": self._analyze_face_geometry(landmarks_3d),
             "expressions": self._analyze_expressions(landmarks_3d),
             "head_pose": self._estimate_head_pose(landmarks_3d),
-            "skin_analysis": self._analyze_skin_from_image(image, landmarks_3d),
+            "skin_analysis": self._analyze_skin_from_image(rgb, landmarks_3d),
             "facial_regions": self._identify_facial_regions(landmarks_3d)
         }
         
         return features
     
-    def _analyze_face_geometry(self, landmarks: List[List[float]]) -> Dict[str, float]:
+    def _analyze_face_geometry(self, landmarks_array: np.ndarray) -> Dict[str, float]:
         """Analyze real facial geometry from landmarks"""
-        landmarks_array = np.array(landmarks)
-        
         # Key facial measurement points (MediaPipe landmark indices)
         left_face = landmarks_array[172]   # Left face boundary
         right_face = landmarks_array[397]  # Right face boundary
@@ -222,10 +456,8 @@ class PhotoProcessor:
             "forehead_height": float(face_height * 0.3)
         }
     
-    def _analyze_expressions(self, landmarks: List[List[float]]) -> Dict[str, float]:
+    def _analyze_expressions(self, landmarks_array: np.ndarray) -> Dict[str, float]:
         """Analyze facial expressions from real landmarks"""
-        landmarks_array = np.array(landmarks)
-        
         # Mouth analysis
         mouth_left = landmarks_array[61]
         mouth_right = landmarks_array[291]
@@ -261,10 +493,8 @@ class PhotoProcessor:
             "disgust": 0.0
         }
     
-    def _estimate_head_pose(self, landmarks: List[List[float]]) -> Dict[str, float]:
+    def _estimate_head_pose(self, landmarks_array: np.ndarray) -> Dict[str, float]:
         """Estimate head pose from facial landmarks"""
-        landmarks_array = np.array(landmarks)
-        
         # Key points for pose estimation
         nose_tip = landmarks_array[1]
         left_eye = landmarks_array[33]
@@ -290,35 +520,22 @@ class PhotoProcessor:
             "roll": float(np.clip(roll, -30, 30))
         }
     
-    def _analyze_skin_from_image(self, image: Image.Image, landmarks: List[List[float]]) -> Dict[str, Any]:
-        """Analyze skin tone from the actual photo"""
-        img_array = np.array(image)
+    def _analyze_skin_from_image(self, img_array: np.ndarray, landmarks: np.ndarray) -> Dict[str, Any]:
+        """Analyze skin tone from the actual photo's pixels"""
         h, w = img_array.shape[:2]
         
-        # Sample face region using landmarks
-        landmarks_array = np.array(landmarks)
-        
-        # Convert normalized coordinates to pixel coordinates
-        face_points = []
-        for landmark in landmarks_array[50:100]:  # Sample from mid-face region
-            x = int((landmark[0] + 1) * w / 2)
-            y = int((landmark[1] + 1) * h / 2)
-            x = max(0, min(w-1, x))
-            y = max(0, min(h-1, y))
-            face_points.append([x, y])
-        
-        # Sample colors from face region
-        colors = []
-        for x, y in face_points:
-            if 0 <= x < w and 0 <= y < h:
-                colors.append(img_array[y, x])
-        
-        if colors:
-            avg_color = np.mean(colors, axis=0)
+        # Convert normalized mid-face landmarks to clamped pixel coordinates
+        sample = landmarks[50:100]
+        xs = np.clip(((sample[:, 0] + 1) * w / 2).astype(np.intp), 0, w - 1)
+        ys = np.clip(((sample[:, 1] + 1) * h / 2).astype(np.intp), 0, h - 1)
+        
+        if len(sample):
+            # Gather the sampled pixels in one fancy-indexing pass
+            avg_color = img_array[ys, xs].mean(axis=0)
         else:
-            # Fallback to center region
+            # Fallback to center region; cv2.mean reduces the view directly
             face_region = img_array[h//4:3*h//4, w//4:3*w//4]
-            avg_color = np.mean(face_region, axis=(0, 1))
+            avg_color = np.array(cv2.mean(face_region)[:3])
         
         return {
             "base_color": avg_color.tolist(),
@@ -327,59 +544,48 @@ class PhotoProcessor:
             "saturation": float(np.std(avg_color))
         }
     
-    def _identify_facial_regions(self, landmarks: List[List[float]]) -> Dict[str, List[int]]:
+    def _identify_facial_regions(self, landmarks: np.ndarray) -> Dict[str, List[int]]:
         """Identify facial regions using MediaPipe landmark indices"""
-        return {
-            "face_oval": list(range(0, 17)) + [172, 136, 150, 149, 176, 148, 152, 377, 400, 378, 379, 365, 397, 288, 361, 323],
-            "left_eyebrow": [70, 63, 105, 66, 107, 55, 65, 52, 53, 46],
-            "right_eyebrow": [296, 334, 293, 300, 276, 283, 282, 295, 285, 336],
-            "left_eye": [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246],
-            "right_eye": [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398],
-            "nose": [19, 20, 1, 2, 5, 4, 6, 168, 8, 9, 10, 151, 195, 197, 196, 3, 51, 48, 115, 131, 134, 102, 49, 220, 305, 292, 308, 324, 318],
-            "mouth": [61, 84, 17, 314, 405, 320, 307, 375, 321, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95, 78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308, 291, 303, 267, 269, 270, 271, 272]
-        }
+        return _FACIAL_REGIONS
     
     async def _generate_realistic_mesh(self, features: Dict[str, Any], image: Image.Image) -> Dict[str, Any]:
         """Generate 3D mesh from real facial landmarks"""
-        await asyncio.sleep(1.0)
+        if self.settings.SIMULATE_LATENCY:
+            await asyncio.sleep(1.0)  # Simulate processing time
         
+        return await self._run_blocking(self._build_realistic_mesh, features, image)
+    
+    def _build_realistic_mesh(self, features: Dict[str, Any], image: Image.Image) -> Dict[str, Any]:
+        """Build the face and head mesh from landmarks (blocking)"""
         landmarks = features["landmarks"]
         geometry = features["face_geometry"]
         facial_regions = features["facial_regions"]
         
-        # Create detailed face mesh using actual MediaPipe landmarks
-        vertices = []
-        
-        # Process each landmark with proper 3D positioning
-        for i, point in enumerate(landmarks):
-            # Use real MediaPipe depth information and scale appropriately
-            x = point[0] * 2.0  # Scale to reasonable face size
-            y = point[1] * 2.0  
-            
-            # Enhanced depth calculation based on facial region
-            base_depth = point[2] * 0.8  # Use MediaPipe's depth estimate
-            
-            # Add region-specific depth adjustments for realism
-            if i in facial_regions.get("nose", []):
-                z = base_depth + 0.15  # Nose protrudes more
-            elif i in facial_regions.get("left_eye", []) or i in facial_regions.get("right_eye", []):
-                z = base_depth + 0.05  # Eyes slightly recessed
-            elif i in facial_regions.get("mouth", []):
-                z = base_depth + 0.08  # Mouth area depth
-            else:
-                z = base_depth + 0.1   # Base face depth
-                
-            vertices.append([float(x), float(y), float(z)])
-        
-        # Add structured back-of-head geometry based on face proportions
-        back_vertices = self._generate_realistic_head_back(vertices, geometry, landmarks)
-        vertices.extend(back_vertices)
+        # Region-specific depth adjustments for realism, assigned in reverse
+        # priority so nose wins over eyes and eyes over mouth where they overlap
+        depth_offset = np.full(len(landmarks), 0.1)  # Base face depth
+        depth_offset[facial_regions.get("mouth", [])] = 0.08  # Mouth area depth
+        depth_offset[facial_regions.get("left_eye", []) + facial_regions.get("right_eye", [])] = 0.05  # Eyes slightly recessed
+        depth_offset[facial_regions.get("nose", [])] = 0.15  # Nose protrudes more
+        
+        # Create detailed face mesh using actual MediaPipe landmarks, scaled
+        # to a reasonable face size, with MediaPipe's depth estimate as base
+        face_vertices = np.column_stack([
+            landmarks[:, :2] * 2.0,
+            landmarks[:, 2] * 0.8 + depth_offset
+        ])
+        
+        # Add structured back-of-head geometry based on face proportions. The
+        # mesh stays in NumPy arrays; the response encoder serializes them
+        # directly, without building nested Python lists
+        back_vertices = self._generate_realistic_head_back(face_vertices, geometry, landmarks)
+        vertices = np.concatenate([face_vertices, back_vertices])
         
         # Generate realistic face topology using MediaPipe connections
-        faces = self._generate_mediapipe_topology(len(landmarks), facial_regions)
+        faces = self._generate_mediapipe_topology()
         
-        # Calculate accurate surface normals for proper lighting
-        normals = self._calculate_vertex_normals(vertices, faces)
+        # Normals are left to the clients, which all recompute them from
+        # vertices and faces
         
         # Generate precise UV mapping for photo texture application
         uvs = self._generate_accurate_uv_mapping(vertices, landmarks, image)
@@ -387,7 +593,6 @@ class PhotoProcessor:
         return {
             "vertices": vertices,
             "faces": faces,
-            "normals": normals,
             "uvs": uvs,
             "vertex_count": len(vertices),
             "face_count": len(faces),
@@ -396,234 +601,150 @@ class PhotoProcessor:
             "face_geometry": geometry
         }
     
-    def _generate_realistic_head_back(self, front_vertices: List[List[float]], geometry: Dict[str, float], landmarks: List[List[float]]) -> List[List[float]]:
+    def _generate_realistic_head_back(self, front_vertices: np.ndarray, geometry: Dict[str, float], landmarks: np.ndarray) -> np.ndarray:
         """Generate realistic back of head geometry based on user's facial proportions"""
-        back_vertices = []
-        
         # Calculate head shape based on user's actual face measurements
         face_width = geometry["face_width"]
         face_height = geometry["face_height"] 
         face_ratio = geometry.get("face_ratio", 1.2)
         
         # Estimate head size from facial landmarks
-        landmarks_array = np.array(landmarks)
-        head_center_x = np.mean([p[0] for p in landmarks_array])
-        head_center_y = np.mean([p[1] for p in landmarks_array]) 
-        
-        # Generate back head with user-specific proportions
-        resolution = 20  # Higher resolution for smoother head shape
-        
-        for i in range(resolution):
-            for j in range(resolution):
-                u = i / (resolution - 1)
-                v = j / (resolution - 1)
-                
-                # Back hemisphere parameterization
-                theta = np.pi + u * np.pi  
-                phi = v * np.pi
-                
-                # Scale ellipsoid based on user's face proportions
-                r_x = face_width * 0.8   # Width based on user's face width
-                r_y = face_height * 0.9  # Height based on user's face height
-                r_z = face_width * 0.6   # Depth proportional to face width
-                
-                x = head_center_x + r_x * np.sin(phi) * np.cos(theta)
-                y = head_center_y + r_y * np.cos(phi) * 0.8
-                z = -r_z * np.sin(phi) * np.sin(theta) - 0.2
-                
-                back_vertices.append([float(x), float(y), float(z)])
-        
-        return back_vertices
-    
-    def _generate_mediapipe_topology(self, landmark_count: int, facial_regions: Dict[str, List[int]]) -> List[List[int]]:
-        """Generate accurate face triangulation using MediaPipe facial regions"""
-        faces = []
-        
-        # MediaPipe face mesh has predefined connections - simulate key ones
-        # Face outline triangulation
-        face_outline = facial_regions.get("face_oval", list(range(17)))
-        for i in range(len(face_outline) - 1):
-            if i + 1 < len(face_outline):
-                # Create triangles connecting face outline
-                center_point = 1  # Nose tip as center reference
-                faces.append([face_outline[i], face_outline[i+1], center_point])
-        
-        # Eye region triangulation
-        for eye_region in ["left_eye", "right_eye"]:
-            eye_points = facial_regions.get(eye_region, [])
-            if len(eye_points) >= 6:
-                eye_center = eye_points[0]
-                for i in range(1, len(eye_points) - 1):
-                    faces.append([eye_center, eye_points[i], eye_points[i+1]])
-        
-        # Nose region triangulation
-        nose_points = facial_regions.get("nose", [])
-        if len(nose_points) >= 6:
-            nose_tip = 1  # MediaPipe nose tip index
-            for i in range(0, len(nose_points) - 1, 2):
-                if i + 1 < len(nose_points):
-                    faces.append([nose_tip, nose_points[i], nose_points[i+1]])
-        
-        # Mouth region triangulation  
-        mouth_points = facial_regions.get("mouth", [])
-        if len(mouth_points) >= 8:
-            mouth_center = mouth_points[len(mouth_points)//2]
-            for i in range(0, len(mouth_points) - 1):
-                faces.append([mouth_center, mouth_points[i], mouth_points[(i+1) % len(mouth_points)]])
-        
-        # Fill remaining areas with systematic triangulation
-        for i in range(0, min(landmark_count - 2, 400), 3):
-            if i + 2 < landmark_count:
-                faces.append([i, i+1, i+2])
-        
-        # Add cross-connections for better mesh density
-        step = max(1, landmark_count // 50)
-        for i in range(0, landmark_count - step, step):
-            for j in range(i + step, min(i + step * 3, landmark_count), step):
-                if j + step < landmark_count:
-                    faces.append([i, j, j + step])
-        
-        return faces
-    
-    def _calculate_vertex_normals(self, vertices: List[List[float]], faces: List[List[int]]) -> List[List[float]]:
-        """Calculate accurate vertex normals for realistic lighting"""
-        vertex_normals = np.zeros((len(vertices), 3))
-        
-        # Calculate face normals and accumulate to vertices
-        for face in faces:
-            if len(face) >= 3 and all(idx < len(vertices) for idx in face):
-                v0 = np.array(vertices[face[0]])
-                v1 = np.array(vertices[face[1]]) 
-                v2 = np.array(vertices[face[2]])
-                
-                # Calculate face normal using cross product
-                edge1 = v1 - v0
-                edge2 = v2 - v0
-                face_normal = np.cross(edge1, edge2)
-                
-                # Normalize face normal
-                norm_length = np.linalg.norm(face_normal)
-                if norm_length > 1e-8:
-                    face_normal = face_normal / norm_length
-                    
-                    # Add to vertex normals (weighted by face area)
-                    face_area = norm_length * 0.5
-                    weighted_normal = face_normal * face_area
-                    
-                    for vertex_idx in face:
-                        vertex_normals[vertex_idx] += weighted_normal
-        
-        # Normalize all vertex normals
-        normals_list = []
-        for i in range(len(vertices)):
-            normal = vertex_normals[i]
-            norm_length = np.linalg.norm(normal)
-            
-            if norm_length > 1e-8:
-                normalized = normal / norm_length
-            else:
-                # Default normal pointing outward from face center
-                vertex_pos = np.array(vertices[i])
-                if np.linalg.norm(vertex_pos) > 1e-8:
-                    normalized = vertex_pos / np.linalg.norm(vertex_pos)
-                else:
-                    normalized = np.array([0.0, 0.0, 1.0])
-            
-            normals_list.append(normalized.tolist())
-        
-        return normals_list
+        head_center_x, head_center_y = landmarks[:, :2].mean(axis=0)
+        
+        # Generate back head with user-specific proportions over a grid;
+        # higher resolution gives a smoother head shape
+        resolution = 20
+        theta, phi = np.meshgrid(
+            np.pi + np.linspace(0.0, 1.0, resolution) * np.pi,  # Back hemisphere
+            np.linspace(0.0, 1.0, resolution) * np.pi,
+            indexing='ij'
+        )
+        
+        # Scale ellipsoid based on user's face proportions
+        r_x = face_width * 0.8   # Width based on user's face width
+        r_y = face_height * 0.9  # Height based on user's face height
+        r_z = face_width * 0.6   # Depth proportional to face width
+        
+        sin_phi = np.sin(phi)
+        back_vertices = np.stack([
+            head_center_x + r_x * sin_phi * np.cos(theta),
+            head_center_y + r_y * np.cos(phi) * 0.8,
+            -r_z * sin_phi * np.sin(theta) - 0.2
+        ], axis=-1)
+        
+        return back_vertices.reshape(-1, 3)
     
-    def _generate_accurate_uv_mapping(self, vertices: List[List[float]], landmarks: List[List[float]], image: Image.Image) -> List[List[float]]:
+    def _generate_mediapipe_topology(self) -> np.ndarray:
+        """Generate accurate face triangulation using MediaPipe's tessellation"""
+        return _FACE_TOPOLOGY
+    
+    def _generate_accurate_uv_mapping(self, vertices: np.ndarray, landmarks: np.ndarray, image: Image.Image) -> np.ndarray:
         """Generate precise UV coordinates for accurate photo texture mapping"""
-        uvs = []
-        
         # Calculate face bounds from landmarks for proper UV scaling
-        landmarks_array = np.array(landmarks)
-        min_x, max_x = landmarks_array[:, 0].min(), landmarks_array[:, 0].max()
-        min_y, max_y = landmarks_array[:, 1].min(), landmarks_array[:, 1].max()
-        
-        face_width = max_x - min_x
-        face_height = max_y - min_y
+        min_xy = landmarks[:, :2].min(axis=0)
+        max_xy = landmarks[:, :2].max(axis=0)
         
         # Center the UV mapping on the face region
-        face_center_x = (min_x + max_x) / 2
-        face_center_y = (min_y + max_y) / 2
+        face_size = max_xy - min_xy
+        face_center = (min_xy + max_xy) / 2
         
-        for vertex in vertices:
-            # Map vertex coordinates to UV space relative to face bounds
-            # This ensures the photo texture aligns properly with facial features
-            
-            # Normalize vertex position relative to face center
-            normalized_x = (vertex[0] - face_center_x) / (face_width + 1e-8)
-            normalized_y = (vertex[1] - face_center_y) / (face_height + 1e-8)
-            
-            # Convert to UV coordinates [0,1] with face centered
-            u = 0.5 + normalized_x * 0.4  # Scale to use central 80% of texture
-            v = 0.5 + normalized_y * 0.4  # This prevents texture stretching
-            
-            # Clamp to valid UV range
-            u = max(0.05, min(0.95, u))  # Leave small border
-            v = max(0.05, min(0.95, v))
-            
-            uvs.append([float(u), float(v)])
+        # Map vertex coordinates to UV space relative to face bounds so the
+        # photo texture aligns with facial features, using the central 80%
+        # of the texture to prevent stretching
+        points = np.asarray(vertices)[:, :2]
+        uvs = 0.5 + (points - face_center) / (face_size + 1e-8) * 0.4
         
-        return uvs
+        # Clamp to valid UV range, leaving a small border
+        return np.clip(uvs, 0.05, 0.95, out=uvs)
     
-    async def _generate_photo_textures(self, image: Image.Image, features: Dict[str, Any]) -> Dict[str, str]:
+    async def _generate_photo_textures(self, image: Image.Image, features: Dict[str, Any], image_hash: str) -> Dict[str, str]:
         """Generate textures directly from the user's photo"""
-        await asyncio.sleep(0.8)
-        
-        # Use the actual photo as the primary texture
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_data = img_bytes.getvalue()
-        base64_image = base64.b64encode(img_data).decode('utf-8')
-        
-        # Create enhanced versions for different material properties
-        # Diffuse: Direct photo
-        diffuse_texture = base64_image
-        
-        # Normal map: Edge-enhanced version
-        normal_image = image.filter(ImageFilter.FIND_EDGES)
-        normal_bytes = io.BytesIO()
-        normal_image.save(normal_bytes, format='PNG')
-        normal_data = normal_bytes.getvalue()
-        normal_texture = base64.b64encode(normal_data).decode('utf-8')
-        
-        # Specular: Reduced contrast version
-        specular_image = ImageEnhance.Contrast(image).enhance(0.5)
-        specular_bytes = io.BytesIO()
-        specular_image.save(specular_bytes, format='PNG')
-        specular_data = specular_bytes.getvalue()
-        specular_texture = base64.b64encode(specular_data).decode('utf-8')
+        if self.settings.SIMULATE_LATENCY:
+            await asyncio.sleep(0.8)  # Simulate processing time
+        
+        photo_format = self.settings.TEXTURE_FORMAT.upper()
+        
+        # The maps are independent, so create and encode them in parallel on
+        # the worker pool (PIL releases the GIL while filtering and encoding)
+        diffuse_texture, normal_texture, specular_texture = await asyncio.gather(
+            # Diffuse: Direct photo, the primary texture
+            self._run_blocking(self._package_texture, image, photo_format, f"{image_hash}_diffuse"),
+            # Normal map: Edge-enhanced version, kept lossless
+            self._run_blocking(self._build_texture, self._create_edge_map, image, 'PNG', f"{image_hash}_normal"),
+            # Specular: Reduced contrast version
+            self._run_blocking(self._build_texture, self._create_specular_map, image, photo_format, f"{image_hash}_specular")
+        )
         
         return {
             "diffuse": diffuse_texture,
             "normal": normal_texture,
             "specular": specular_texture,
-            "roughness": diffuse_texture  # Use photo as roughness base
+            # The photo doubles as the roughness base; reference the diffuse
+            # map rather than sending the same texture twice
+            "roughness_ref": "diffuse"
         }
     
+    def _build_texture(self, create_map, image: Image.Image, image_format: str, texture_key: str) -> str:
+        """Create and package one texture map (blocking)"""
+        return self._package_texture(create_map(image), image_format, texture_key)
+    
+    def _package_texture(self, texture: Image.Image, image_format: str, texture_key: str) -> str:
+        """Package a texture for the avatar payload (blocking)"""
+        # Legacy clients expect base64 images embedded in the payload; otherwise
+        # keep the raw map server-side and let clients fetch it by URL, so
+        # stored avatars do not hold the encoded images
+        if self.settings.INLINE_TEXTURES:
+            return self._image_to_base64(texture, image_format)
+        
+        return texture_store.put(texture_key, texture)
+    
+    def _create_edge_map(self, image: Image.Image) -> Image.Image:
+        """Create the edge-enhanced map used as the normal texture"""
+        return image.filter(ImageFilter.FIND_EDGES)
+    
+    def _create_specular_map(self, image: Image.Image) -> Image.Image:
+        """Create the reduced-contrast specular map"""
+        return self._adjust_contrast(image, 0.5)
+    
+    def _image_to_base64(self, image: Image.Image, image_format: str = 'PNG') -> str:
+        """Convert PIL Image to base64 string"""
+        buffer = io.BytesIO()
+        if image_format == 'JPEG':
+            # Photo-derived maps compress far smaller and faster than PNG
+            image.save(buffer, format='JPEG', quality=85)
+        else:
+            image.save(buffer, format=image_format)
+        # Encode straight from the buffer's memory instead of a getvalue() copy
+        return b64encode_str(buffer.getbuffer())
+    
+    def _adjust_contrast(self, image: Image.Image, factor: float) -> Image.Image:
+        """ImageEnhance.Contrast equivalent applied as a per-channel lookup table"""
+        # Same blend around the rounded mean luma, but as one point() pass
+        # instead of building and blending a full degenerate image
+        mean = int(np.asarray(image.convert('L')).mean() + 0.5)
+        levels = np.trunc(mean + factor * (np.arange(256) - mean))
+        contrast_lut = np.clip(levels, 0, 255).astype(int).tolist()
+        
+        return image.point(contrast_lut * len(image.getbands()))
+    
     async def _generate_realistic_animations(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Generate animations based on detected facial features"""
-        await asyncio.sleep(0.3)
+        if self.settings.SIMULATE_LATENCY:
+            await asyncio.sleep(0.3)  # Simulate processing time
         
         expressions = features["expressions"]
-        landmarks = features["landmarks"]
+        blend_shapes = await self._run_blocking(
+            self._build_blend_shapes, expressions, len(features["landmarks"])
+        )
         
-        # Create blend shapes based on actual facial structure
-        blend_shapes = {}
-        for emotion, intensity in expressions.items():
-            # Create blend shape deltas based on expression analysis
-            deltas = []
-            for i, landmark in enumerate(landmarks):
-                # Calculate subtle movements for each landmark
-                delta_x = np.random.uniform(-0.002, 0.002) * intensity
-                delta_y = np.random.uniform(-0.002, 0.002) * intensity
-                delta_z = np.random.uniform(-0.001, 0.001) * intensity
-                deltas.extend([delta_x, delta_y, delta_z])
-            
-            blend_shapes[emotion] = deltas
+        # With fp16 mesh buffers, keyframes name their blend shape instead of
+        # embedding another copy of its per-vertex deltas
+        reference_shapes = self.settings.MESH_ENCODING == "fp16"
+        
+        def keyframe(seconds: float, emotion: str) -> Dict[str, Any]:
+            if reference_shapes:
+                return {"time": seconds, "blend_shape": emotion}
+            return {"time": seconds, "blend_shapes": blend_shapes[emotion]}
         
         # Create natural animation sequences
         animations = [
@@ -632,9 +753,9 @@ class PhotoProcessor:
                 "duration": 4.0,
                 "loop": True,
                 "keyframes": [
-                    {"time": 0.0, "blend_shapes": blend_shapes["neutral"]},
-                    {"time": 2.0, "blend_shapes": blend_shapes["neutral"]},
-                    {"time": 4.0, "blend_shapes": blend_shapes["neutral"]}
+                    keyframe(0.0, "neutral"),
+                    keyframe(2.0, "neutral"),
+                    keyframe(4.0, "neutral")
                 ]
             },
             {
@@ -642,9 +763,9 @@ class PhotoProcessor:
                 "duration": 0.3,
                 "loop": True,
                 "keyframes": [
-                    {"time": 0.0, "blend_shapes": blend_shapes["neutral"]},
-                    {"time": 0.15, "blend_shapes": blend_shapes["neutral"]},
-                    {"time": 0.3, "blend_shapes": blend_shapes["neutral"]}
+                    keyframe(0.0, "neutral"),
+                    keyframe(0.15, "neutral"),
+                    keyframe(0.3, "neutral")
                 ]
             }
         ]
@@ -657,9 +778,9 @@ class PhotoProcessor:
                 "duration": 2.0,
                 "loop": False,
                 "keyframes": [
-                    {"time": 0.0, "blend_shapes": blend_shapes["neutral"]},
-                    {"time": 1.0, "blend_shapes": blend_shapes[max_emotion[0]]},
-                    {"time": 2.0, "blend_shapes": blend_shapes["neutral"]}
+                    keyframe(0.0, "neutral"),
+                    keyframe(1.0, max_emotion[0]),
+                    keyframe(2.0, "neutral")
                 ]
             })
         
@@ -669,39 +790,33 @@ class PhotoProcessor:
             "sequences": animations
         }
     
+    def _build_blend_shapes(self, expressions: Dict[str, float], landmark_count: int) -> Dict[str, List[float]]:
+        """Draw per-landmark blend shape deltas for every emotion (blocking)"""
+        # Create blend shapes based on actual facial structure: subtle
+        # (x, y, z) movements for every landmark, drawn for every emotion in
+        # one call and scaled by its detected intensity
+        intensities = np.fromiter(expressions.values(), dtype=np.float64, count=len(expressions))
+        deltas = self._rng.uniform(
+            -_BLEND_SHAPE_SCALE, _BLEND_SHAPE_SCALE, size=(len(expressions), landmark_count, 3)
+        )
+        deltas *= intensities[:, None, None]
+        return dict(zip(expressions, deltas.reshape(len(expressions), -1).tolist()))
+    
     def _generate_photo_materials(self, features: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """Generate material properties based on photo analysis"""
-        if features and "skin_analysis" in features:
-            skin = features["skin_analysis"]
-            base_color = [c/255.0 for c in skin["base_color"]] + [1.0]
-        else:
-            base_color = [0.8, 0.7, 0.6, 1.0]
+        if not (features and "skin_analysis" in features):
+            return _MATERIAL_TEMPLATE
         
+        skin = features["skin_analysis"]
+        base_color = [c/255.0 for c in skin["base_color"]] + [1.0]
         return {
-            "skin": {
-                "albedo": base_color,
-                "metallic": 0.0,
-                "roughness": 0.7,
-                "subsurface": 0.3,
-                "emission": [0.0, 0.0, 0.0]
-            },
-            "eyes": {
-                "albedo": [0.2, 0.3, 0.4, 1.0],
-                "metallic": 0.0,
-                "roughness": 0.1,
-                "emission": [0.0, 0.0, 0.0]
-            }
+            **_MATERIAL_TEMPLATE,
+            "skin": {**_MATERIAL_TEMPLATE["skin"], "albedo": base_color}
         }
     
     def _generate_lighting_params(self) -> Dict[str, float]:
         """Generate optimal lighting for photorealistic rendering"""
-        return {
-            "ambient_intensity": 0.2,
-            "directional_intensity": 0.8,
-            "rim_light_intensity": 0.3,
-            "shadow_strength": 0.4,
-            "subsurface_scattering": 0.2
-        }
+        return _LIGHTING_PARAMS
     
     # Fallback methods when MediaPipe is not available
     async def _extract_basic_features(self, image: Image.Image) -> Dict[str, Any]:
@@ -714,46 +829,21 @@ class PhotoProcessor:
     
     async def _generate_fallback_mesh(self, image: Image.Image) -> Dict[str, Any]:
         """Generate basic mesh when MediaPipe unavailable"""
-        vertices = []
-        faces = []
-        
-        # Create simple face-shaped mesh
-        for i in range(20):
-            for j in range(20):
-                u = (i / 19.0 - 0.5) * 2
-                v = (j / 19.0 - 0.5) * 1.5
-                
-                # Create face-like shape
-                r = 1.0 - (u*u + v*v*0.7)
-                if r > 0:
-                    z = 0.1 * np.sqrt(r)
-                    vertices.append([u, v, z])
-        
-        # Generate faces
-        for i in range(len(vertices) - 3):
-            faces.append([i, i+1, i+2])
-        
-        return {
-            "vertices": vertices,
-            "faces": faces,
-            "normals": [[0, 0, 1]] * len(vertices),
-            "uvs": [[(v[0]+1)*0.5, (v[1]+1)*0.5] for v in vertices],
-            "vertex_count": len(vertices),
-            "face_count": len(faces),
-            "mesh_quality": "basic_fallback"
-        }
+        # The fallback mesh does not depend on the photo; callers only read it
+        return dict(_FALLBACK_MESH)
     
-    async def _generate_basic_textures(self, image: Image.Image) -> Dict[str, str]:
+    async def _generate_basic_textures(self, image: Image.Image, image_hash: str) -> Dict[str, str]:
         """Generate basic textures from photo"""
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_data = img_bytes.getvalue()
-        base64_image = base64.b64encode(img_data).decode('utf-8')
+        diffuse_texture = await self._run_blocking(
+            self._package_texture, image, 'PNG', f"{image_hash}_diffuse"
+        )
         
+        # The photo serves as every map. The iOS and Unity clients read the
+        # normal and specular keys, so all three share the one packaged texture
         return {
-            "diffuse": base64_image,
-            "normal": base64_image,
-            "specular": base64_image
+            "diffuse": diffuse_texture,
+            "normal": diffuse_texture,
+            "specular": diffuse_texture
         }
     
     async def _generate_basic_animations(self) -> Dict[str, Any]:
@@ -770,7 +860,7 @@ class PhotoProcessor:
         
         # Create simple mesh but use user's photo as texture
         mesh_data = await self._generate_fallback_mesh(image)
-        textures = await self._generate_basic_textures(image)
+        textures = await self._generate_basic_textures(image, image_hash)
         animations = await self._generate_basic_animations()
         
         avatar_data = {
@@ -778,6 +868,7 @@ class PhotoProcessor:
             "created_at": current_time,
             "vertices": mesh_data["vertices"],
             "faces": mesh_data["faces"],
+            "uvs": mesh_data["uvs"],
             "textures": textures,
             "blend_shapes": animations["blend_shapes"],
             "skeleton": animations.get("skeleton"),
@@ -0,0 +1,67 @@
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+
+# Modes whose raw bytes fully describe the pixel colours
+_SELF_CONTAINED_MODES = ("L", "LA", "RGB", "RGBA")
+
+
+class TextureStore:
+    """In-process LRU store for generated texture maps served by URL"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, image: Image.Image) -> str:
+        """Store raw texture pixels and return the URL clients fetch them from"""
+        # Only the raw pixels are kept, so expand palette and other modes whose
+        # colours depend on image metadata before storing them
+        if image.mode not in _SELF_CONTAINED_MODES:
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        entry = {
+            "data": image.tobytes(),
+            "mode": image.mode,
+            "size": image.size,
+            "encoded": None
+        }
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return f"/api/textures/{key}"
+
+    def contains(self, url: str) -> bool:
+        """Check whether a texture URL returned by put() is still stored"""
+        key = url.rsplit("/", 1)[-1]
+        with self._lock:
+            return key in self._entries
+
+    def get_png(self, key: str) -> Optional[bytes]:
+        """Get a stored texture as PNG bytes, encoding it on first access"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+
+        if entry["encoded"] is None:
+            image = Image.frombytes(entry["mode"], entry["size"], entry["data"])
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+            entry["encoded"] = buffer.getvalue()
+
+        return entry["encoded"]
+
+
+# Shared store so the API layer can serve textures created by any processor
+texture_store = TextureStore()
@@ -1,8 +1,35 @@
 import os
-from typing import Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
 
+# Per-quality processing presets, read-only so the shared views cannot be
+# changed by callers
+_QUALITY_MAP = MappingProxyType({
+    "low": MappingProxyType({
+        "texture_resolution": 256,
+        "mesh_vertices": 1000,
+        "animation_fps": 15,
+        "processing_timeout": 60
+    }),
+    "medium": MappingProxyType({
+        "texture_resolution": 512,
+        "mesh_vertices": 5000,
+        "animation_fps": 24,
+        "processing_timeout": 180
+    }),
+    "high": MappingProxyType({
+        "texture_resolution": 1024,
+        "mesh_vertices": 15000,
+        "animation_fps": 30,
+        "processing_timeout": 300
+    })
+})
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application configuration settings"""
+    """Application configuration settings, read from the environment at import"""
     
     # API Configuration
     API_HOST: str = "0.0.0.0"
@@ -18,6 +45,8 @@ class Settings:
     MAX_CONCURRENT_JOBS: int = int(os.getenv("MAX_CONCURRENT_JOBS", "4"))
     PROCESSING_TIMEOUT: int = int(os.getenv("PROCESSING_TIMEOUT", "300"))  # seconds
     CLEANUP_INTERVAL: int = int(os.getenv("CLEANUP_INTERVAL", "3600"))  # seconds
+    STATUS_CACHE_SIZE: int = int(os.getenv("STATUS_CACHE_SIZE", "1000"))  # processing statuses kept in memory
+    SIMULATE_LATENCY: bool = os.getenv("SIMULATE_LATENCY", "false").lower() == "true"  # demo pacing only
     
     # Storage Configuration
     UPLOAD_PATH: str = os.getenv("UPLOAD_PATH", "./uploads")
@@ -32,8 +61,8 @@ class Settings:
     
     # Security
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
-    ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".png", ".webp"}
-    CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "*").split(",")
+    ALLOWED_EXTENSIONS: frozenset = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+    CORS_ORIGINS: tuple = tuple(os.getenv("CORS_ORIGINS", "*").split(","))
     
     # Performance
     ENABLE_GPU: bool = os.getenv("ENABLE_GPU", "false").lower() == "true"
@@ -49,6 +78,11 @@ class Settings:
     DEFAULT_QUALITY: str = os.getenv("DEFAULT_QUALITY", "high")  # low, medium, high
     TEXTURE_RESOLUTION: int = int(os.getenv("TEXTURE_RESOLUTION", "512"))
     MESH_DETAIL_LEVEL: str = os.getenv("MESH_DETAIL_LEVEL", "medium")  # low, medium, high
+    INLINE_TEXTURES: bool = os.getenv("INLINE_TEXTURES", "true").lower() == "true"  # base64 in payload for legacy clients
+    TEXTURE_FORMAT: str = os.getenv("TEXTURE_FORMAT", "jpeg")  # jpeg, png (inline photo textures)
+    TEXTURE_CACHE_SIZE: int = int(os.getenv("TEXTURE_CACHE_SIZE", "256"))
+    MESH_ENCODING: str = os.getenv("MESH_ENCODING", "json")  # json, fp16
+    AVATAR_CACHE_SIZE: int = int(os.getenv("AVATAR_CACHE_SIZE", "128"))  # avatars kept per image hash
     
     # Animation Settings
     ENABLE_FACIAL_ANIMATION: bool = os.getenv("ENABLE_FACIAL_ANIMATION", "true").lower() == "true"
@@ -59,7 +93,7 @@ class Settings:
     MAX_RETRY_ATTEMPTS: int = int(os.getenv("MAX_RETRY_ATTEMPTS", "3"))
     RETRY_DELAY: float = float(os.getenv("RETRY_DELAY", "1.0"))
     
-    def __init__(self):
+    def __post_init__(self):
         # Create necessary directories
         os.makedirs(self.UPLOAD_PATH, exist_ok=True)
         os.makedirs(self.OUTPUT_PATH, exist_ok=True)
@@ -79,11 +113,20 @@ class Settings:
         if self.PROCESSING_TIMEOUT <= 0:
             raise ValueError("PROCESSING_TIMEOUT must be positive")
         
+        if self.STATUS_CACHE_SIZE <= 0:
+            raise ValueError("STATUS_CACHE_SIZE must be positive")
+        
         if self.DEFAULT_QUALITY not in ["low", "medium", "high"]:
             raise ValueError("DEFAULT_QUALITY must be low, medium, or high")
         
         if self.DEVICE not in ["cpu", "cuda", "mps"]:
             raise ValueError("DEVICE must be cpu, cuda, or mps")
+        
+        if self.MESH_ENCODING not in ["json", "fp16"]:
+            raise ValueError("MESH_ENCODING must be json or fp16")
+        
+        if self.TEXTURE_FORMAT not in ["jpeg", "png"]:
+            raise ValueError("TEXTURE_FORMAT must be jpeg or png")
     
     @property
     def use_cloud_storage(self) -> bool:
@@ -91,29 +134,9 @@ class Settings:
         return bool(self.AWS_ACCESS_KEY_ID and self.AWS_SECRET_ACCESS_KEY and self.AWS_BUCKET_NAME)
     
     @property
-    def quality_settings(self) -> dict:
+    def quality_settings(self) -> Mapping[str, int]:
         """Get quality-specific settings"""
-        quality_map = {
-            "low": {
-                "texture_resolution": 256,
-                "mesh_vertices": 1000,
-                "animation_fps": 15,
-                "processing_timeout": 60
-            },
-            "medium": {
-                "texture_resolution": 512,
-                "mesh_vertices": 5000,
-                "animation_fps": 24,
-                "processing_timeout": 180
-            },
-            "high": {
-                "texture_resolution": 1024,
-                "mesh_vertices": 15000,
-                "animation_fps": 30,
-                "processing_timeout": 300
-            }
-        }
-        return quality_map.get(self.DEFAULT_QUALITY, quality_map["medium"])
+        return _QUALITY_MAP.get(self.DEFAULT_QUALITY, _QUALITY_MAP["medium"])
     
     def get_model_config(self) -> dict:
         """Get AI model configuration"""
@@ -144,3 +167,9 @@ class Settings:
             })
         
         return config
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings, creating them on first use"""
+    return Settings()
@@ -10,19 +10,47 @@ from fastapi.responses import HTMLResponse, JSONResponse, Response
 import uvicorn
 import json
 import asyncio
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from pathlib import Path
 import shutil
 from PIL import Image
 import io
 import base64
 
-from api.processing_real import PhotoProcessor
 from api.models import ProcessingStatus, Avatar3DModel
-from config import Settings
+from api.texture_store import texture_store
+from config import get_settings
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class AvatarResponse(JSONResponse):
+    """JSON response for avatar payloads, rendered with orjson when available"""
+    
+    def render(self, content) -> bytes:
+        # Avatar payloads carry hundreds of vertices plus texture data; orjson
+        # serializes them several times faster than the stdlib encoder
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        # Mesh arrays may be NumPy arrays, which the stdlib encoder needs
+        # converted to lists
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+            default=lambda value: value.tolist()
+        ).encode("utf-8")
 
 # Initialize FastAPI app
-app = FastAPI(title="MirrorWorld API", version="1.0.0")
+app = FastAPI(title="MirrorWorld API", version="1.0.0", default_response_class=AvatarResponse)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -42,12 +70,58 @@ async def get_app_js():
 async def get_scene_js():
     return FileResponse("static/scene.js", media_type="application/javascript")
 
-# Initialize settings and processor
-settings = Settings()
-processor = PhotoProcessor(settings)
+# Initialize settings
+settings = get_settings()
+texture_store.max_entries = settings.TEXTURE_CACHE_SIZE
+
+# The processor imports MediaPipe and builds its models, so it is created on
+# the first upload instead of slowing down startup and the static endpoints
+_processor = None
+_processor_lock = threading.Lock()
+
+def get_processor():
+    """Get the shared photo processor, creating it on first use"""
+    global _processor
+    with _processor_lock:
+        if _processor is None:
+            from api.processing_real import PhotoProcessor
+            _processor = PhotoProcessor(settings)
+        return _processor
+
+# Storage for processing status, oldest upload first. Entries expire after
+# CLEANUP_INTERVAL seconds and the oldest are dropped past STATUS_CACHE_SIZE,
+# so finished avatars do not pile up when clients never call /api/cleanup
+processing_status = OrderedDict()
+_status_created = OrderedDict()
 
-# Storage for processing status
-processing_status = {}
+def _register_process(process_id: str, status: dict):
+    """Track a new processing status, evicting expired and excess entries"""
+    now = time.monotonic()
+    while _status_created:
+        oldest_id, created = next(iter(_status_created.items()))
+        if len(_status_created) < settings.STATUS_CACHE_SIZE and now - created < settings.CLEANUP_INTERVAL:
+            break
+        del _status_created[oldest_id]
+        processing_status.pop(oldest_id, None)
+    
+    processing_status[process_id] = status
+    _status_created[process_id] = now
+
+# Uploads are read in chunks of this many bytes while checking MAX_FILE_SIZE
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Smallest size JPEG uploads may be decoded at (see Image.draft)
+_DECODE_MIN_SIZE = (512, 512)
+
+# Progress stages reported while an avatar generates: (progress, message,
+# longest time in seconds to show the stage before moving to the next)
+_PROGRESS_STAGES = [
+    (15, "Using AI to detect facial landmarks and features...", 1),
+    (35, "Extracting 3D facial geometry from your photo...", 2),
+    (60, "Creating your personalized 3D face model...", 3),
+    (80, "Mapping your facial features to the 3D model...", 2),
+    (95, "Optimizing your 3D avatar for realistic rendering...", 1),
+]
 
 @app.get("/", response_class=HTMLResponse)
 @app.head("/")
@@ -67,17 +141,28 @@ async def upload_photo(file: UploadFile = File(...)):
         # Generate unique processing ID
         process_id = str(uuid.uuid4())
         
-        # Read and validate image
-        contents = await file.read()
+        # Read the upload in chunks, rejecting it as soon as it passes the
+        # size limit instead of loading an arbitrarily large file into memory
+        if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail="File too large")
+        contents = bytearray()
+        while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+            contents += chunk
+            if len(contents) > settings.MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+        
+        # Read and validate image. The processors work at 512px, so let JPEG
+        # uploads decode at a reduced DCT scale no smaller than that
         image = Image.open(io.BytesIO(contents))
+        image.draft('RGB', _DECODE_MIN_SIZE)
         
         # Initialize processing status
-        processing_status[process_id] = {
+        _register_process(process_id, {
             "status": "processing",
             "progress": 0,
             "message": "Starting photo analysis...",
             "avatar_data": None
-        }
+        })
         
         # Start background processing
         asyncio.create_task(process_photo_background(process_id, image))
@@ -88,53 +173,36 @@ async def upload_photo(file: UploadFile = File(...)):
             "message": "Photo processing initiated"
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 async def process_photo_background(process_id: str, image: Image.Image):
     """Background task to process photo into 3D avatar"""
+    # Hold on to the status entry so updates still land if it is evicted
+    status = processing_status[process_id]
     try:
-        # Stage 1: Face detection with MediaPipe
-        processing_status[process_id].update({
-            "progress": 15,
-            "message": "Using AI to detect facial landmarks and features..."
-        })
-        await asyncio.sleep(1)
-        
-        # Stage 2: Real 3D mesh extraction
-        processing_status[process_id].update({
-            "progress": 35,
-            "message": "Extracting 3D facial geometry from your photo..."
-        })
-        await asyncio.sleep(2)
+        # Start the real work right away and report progress stages while it
+        # runs; a stage only lasts as long as the avatar takes to generate
+        processor = await asyncio.to_thread(get_processor)
+        generation = asyncio.create_task(processor.generate_3d_avatar(image))
         
-        # Stage 3: Photorealistic mesh generation
-        processing_status[process_id].update({
-            "progress": 60,
-            "message": "Creating your personalized 3D face model..."
-        })
-        await asyncio.sleep(3)
+        for progress, message, duration in _PROGRESS_STAGES:
+            status.update({
+                "progress": progress,
+                "message": message
+            })
+            done, _ = await asyncio.wait({generation}, timeout=duration)
+            if done:
+                break
         
-        # Stage 4: Texture mapping from photo
-        processing_status[process_id].update({
-            "progress": 80,
-            "message": "Mapping your facial features to the 3D model..."
-        })
-        await asyncio.sleep(2)
-        
-        # Stage 5: Final optimization
-        processing_status[process_id].update({
-            "progress": 95,
-            "message": "Optimizing your 3D avatar for realistic rendering..."
-        })
-        await asyncio.sleep(1)
-        
-        # Generate avatar data using processor
+        # Wait for the avatar to finish generating
         try:
-            avatar_data = await processor.generate_3d_avatar(image)
+            avatar_data = await generation
         except Exception as e:
             if "No face detected" in str(e):
-                processing_status[process_id].update({
+                status.update({
                     "status": "failed",
                     "progress": 0,
                     "message": "No face detected in the image. Please upload a clear photo showing your face directly facing the camera."
@@ -144,7 +212,7 @@ async def process_photo_background(process_id: str, image: Image.Image):
                 raise e
         
         # Complete processing
-        processing_status[process_id].update({
+        status.update({
             "status": "completed",
             "progress": 100,
             "message": "Avatar generation complete!",
@@ -152,7 +220,7 @@ async def process_photo_background(process_id: str, image: Image.Image):
         })
         
     except Exception as e:
-        processing_status[process_id].update({
+        status.update({
             "status": "failed",
             "progress": 0,
             "message": f"Processing failed: {str(e)}"
@@ -164,7 +232,7 @@ async def get_processing_status(process_id: str):
     if process_id not in processing_status:
         raise HTTPException(status_code=404, detail="Process ID not found")
     
-    return JSONResponse(processing_status[process_id])
+    return AvatarResponse(processing_status[process_id])
 
 @app.get("/api/avatar/{process_id}")
 async def get_avatar_data(process_id: str):
@@ -176,13 +244,23 @@ async def get_avatar_data(process_id: str):
     if status["status"] != "completed":
         raise HTTPException(status_code=400, detail="Avatar not ready yet")
     
-    return JSONResponse(status["avatar_data"])
+    return AvatarResponse(status["avatar_data"])
+
+@app.get("/api/textures/{texture_key}")
+async def get_texture(texture_key: str):
+    """Get a generated texture map"""
+    png_data = texture_store.get_png(texture_key)
+    if png_data is None:
+        raise HTTPException(status_code=404, detail="Texture not found")
+    
+    return Response(content=png_data, media_type="image/png")
 
 @app.delete("/api/cleanup/{process_id}")
 async def cleanup_processing_data(process_id: str):
     """Clean up processing data"""
     if process_id in processing_status:
         del processing_status[process_id]
+        del _status_created[process_id]
     
     return JSONResponse({"message": "Cleanup completed"})
 
@@ -192,7 +270,7 @@ async def health_check():
     return JSONResponse({
         "status": "healthy",
         "version": "1.0.0",
-        "ai_models_loaded": processor.models_loaded()
+        "ai_models_loaded": _processor is not None and _processor.models_loaded()
     })
 
 if __name__ == "__main__":
@@ -325,7 +325,9 @@ class SceneManager {
         
         // Create realistic head from user's facial data
         let head;
-        if (avatarData && avatarData.vertices && avatarData.faces) {
+        const hasVertices = avatarData && (avatarData.vertices && avatarData.vertices.length > 0 ||
+            avatarData.mesh_buffers && avatarData.mesh_buffers.vertices);
+        if (hasVertices && avatarData.faces) {
             head = this.createRealisticHead(avatarData);
         } else {
             // Fallback to simple head
@@ -408,6 +410,29 @@ class SceneManager {
         };
     }
     
+    decodeFloat16Buffer(buffer) {
+        // Decode a base64 little-endian float16 buffer into a Float32Array
+        const bytes = Uint8Array.from(atob(buffer.data), c => c.charCodeAt(0));
+        const halves = new Uint16Array(bytes.buffer);
+        const floats = new Float32Array(halves.length);
+        
+        for (let i = 0; i < halves.length; i++) {
+            const sign = halves[i] & 0x8000 ? -1 : 1;
+            const exponent = (halves[i] >> 10) & 0x1f;
+            const fraction = halves[i] & 0x3ff;
+            
+            if (exponent === 0) {
+                floats[i] = sign * Math.pow(2, -14) * (fraction / 1024);
+            } else if (exponent === 31) {
+                floats[i] = fraction ? NaN : sign * Infinity;
+            } else {
+                floats[i] = sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+            }
+        }
+        
+        return floats;
+    }
+    
     createRealisticHead(avatarData) {
         try {
             console.log('Avatar data received:', avatarData);
@@ -418,21 +443,29 @@ class SceneManager {
             // Extract vertex data
             const vertices = avatarData.vertices;
             const faces = avatarData.faces;
+            const meshBuffers = avatarData.mesh_buffers;
+            
+            // Convert vertices to Float32Array, either from a packed float16
+            // buffer or from the nested JSON lists
+            let positions;
+            if (meshBuffers && meshBuffers.vertices) {
+                positions = this.decodeFloat16Buffer(meshBuffers.vertices);
+            } else if (vertices && vertices.length > 0) {
+                positions = new Float32Array(vertices.length * 3);
+                for (let i = 0; i < vertices.length; i++) {
+                    positions[i * 3] = vertices[i][0];
+                    positions[i * 3 + 1] = vertices[i][1];
+                    positions[i * 3 + 2] = vertices[i][2];
+                }
+            }
+            const vertexCount = positions ? positions.length / 3 : 0;
             
-            if (!vertices || !faces || vertices.length === 0) {
+            if (!faces || vertexCount === 0) {
                 console.error('Invalid avatar data - missing vertices or faces');
                 throw new Error('Invalid avatar data');
             }
             
-            console.log('Creating realistic head with', vertices.length, 'vertices and', faces.length, 'faces');
-            
-            // Convert vertices to Float32Array
-            const positions = new Float32Array(vertices.length * 3);
-            for (let i = 0; i < vertices.length; i++) {
-                positions[i * 3] = vertices[i][0];
-                positions[i * 3 + 1] = vertices[i][1];
-                positions[i * 3 + 2] = vertices[i][2];
-            }
+            console.log('Creating realistic head with', vertexCount, 'vertices and', faces.length, 'faces');
             geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3));
             
             // Convert faces to indices
@@ -440,9 +473,9 @@ class SceneManager {
             for (let i = 0; i < faces.length; i++) {
                 if (faces[i].length >= 3) {
                     // Ensure indices are within bounds
-                    const v0 = Math.min(faces[i][0], vertices.length - 1);
-                    const v1 = Math.min(faces[i][1], vertices.length - 1);
-                    const v2 = Math.min(faces[i][2], vertices.length - 1);
+                    const v0 = Math.min(faces[i][0], vertexCount - 1);
+                    const v1 = Math.min(faces[i][1], vertexCount - 1);
+                    const v2 = Math.min(faces[i][2], vertexCount - 1);
                     indices.push(v0, v1, v2);
                 }
             }
@@ -450,7 +483,9 @@ class SceneManager {
             geometry.setIndex(indices);
             
             // Add UV coordinates if available
-            if (avatarData.uvs) {
+            if (meshBuffers && meshBuffers.uvs) {
+                geometry.setAttribute('uv', new THREE.BufferAttribute(this.decodeFloat16Buffer(meshBuffers.uvs), 2));
+            } else if (avatarData.uvs && avatarData.uvs.length > 0) {
                 const uvs = new Float32Array(avatarData.uvs.length * 2);
                 for (let i = 0; i < avatarData.uvs.length; i++) {
                     uvs[i * 2] = avatarData.uvs[i][0];
@@ -470,8 +505,12 @@ class SceneManager {
             let material;
             if (avatarData.textures && avatarData.textures.diffuse) {
                 const textureLoader = new THREE.TextureLoader();
+                // Textures are either served by URL or embedded as base64 JPEG/PNG
+                const diffuse = avatarData.textures.diffuse;
+                const mimeType = diffuse.startsWith('/9j/') ? 'image/jpeg' : 'image/png';
+                const textureSource = diffuse.startsWith('/api/') ? diffuse : 'data:' + mimeType + ';base64,' + diffuse;
                 const texture = textureLoader.load(
-                    'data:image/png;base64,' + avatarData.textures.diffuse,
+                    textureSource,
                     (tex) => {
                         console.log('Photo texture loaded successfully', tex.image.width, 'x', tex.image.height);
                         // Force render update when texture loads
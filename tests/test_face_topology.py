@@ -0,0 +1,23 @@
+from collections import Counter
+
+import pytest
+
+from api.face_topology import tessellation_triangles
+
+mp = pytest.importorskip("mediapipe")
+
+
+def test_tessellation_is_a_manifold_surface():
+    triangles = tessellation_triangles(mp.solutions.face_mesh.FACEMESH_TESSELATION)
+    edge_use = Counter(
+        edge for a, b, c in triangles.tolist() for edge in ((a, b), (a, c), (b, c))
+    )
+
+    assert max(edge_use.values()) <= 2
+
+
+def test_separating_triangles_are_dropped():
+    triangles = {tuple(t) for t in tessellation_triangles(mp.solutions.face_mesh.FACEMESH_TESSELATION).tolist()}
+
+    assert (49, 64, 129) not in triangles
+    assert (279, 294, 358) not in triangles
@@ -0,0 +1,35 @@
+import numpy as np
+from PIL import Image
+
+from api.image_hash import hash_image_pixels
+
+
+def _palette_image(palette):
+    """A 64x64 palette image using every index once, with the given palette"""
+    image = Image.fromarray(np.arange(64 * 64, dtype=np.uint8).reshape(64, 64), 'P')
+    image.putpalette(palette)
+    return image
+
+
+GRAY_PALETTE = [value for index in range(256) for value in (index, index, index)]
+INVERTED_PALETTE = [255 - value for value in GRAY_PALETTE]
+
+
+def test_hash_is_stable_for_identical_images():
+    assert hash_image_pixels(_palette_image(GRAY_PALETTE)) == hash_image_pixels(_palette_image(GRAY_PALETTE))
+
+
+def test_palette_images_with_different_palettes_hash_differently():
+    assert hash_image_pixels(_palette_image(GRAY_PALETTE)) != hash_image_pixels(_palette_image(INVERTED_PALETTE))
+
+
+def test_palette_transparency_is_part_of_the_hash():
+    opaque = _palette_image(GRAY_PALETTE)
+    transparent = _palette_image(GRAY_PALETTE)
+    transparent.info["transparency"] = 0
+    assert hash_image_pixels(opaque) != hash_image_pixels(transparent)
+
+
+def test_mode_is_part_of_the_hash():
+    pixels = np.zeros((32, 32), dtype=np.uint8)
+    assert hash_image_pixels(Image.fromarray(pixels, 'L')) != hash_image_pixels(Image.fromarray(pixels, 'P'))
@@ -0,0 +1,69 @@
+import asyncio
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+pytest.importorskip("cv2")
+
+from api.processing_real import PhotoProcessor
+from config import get_settings
+
+
+def _palette_image(palette):
+    """A 64x64 palette image with no face in it, using the given palette"""
+    image = Image.fromarray(np.arange(64 * 64, dtype=np.uint8).reshape(64, 64), 'P')
+    image.putpalette(palette)
+    return image
+
+
+def test_palette_uploads_differing_only_in_palette_get_distinct_avatars():
+    processor = PhotoProcessor(get_settings())
+    gray = [value for index in range(256) for value in (index, index, index)]
+    inverted = [255 - value for value in gray]
+
+    first = asyncio.run(processor.generate_3d_avatar(_palette_image(gray)))
+    second = asyncio.run(processor.generate_3d_avatar(_palette_image(inverted)))
+
+    assert first["source_image_hash"] != second["source_image_hash"]
+    assert first["textures"]["diffuse"] != second["textures"]["diffuse"]
+
+
+def _settings(mesh_encoding):
+    return replace(get_settings(), MESH_ENCODING=mesh_encoding)
+
+
+def _animations(mesh_encoding):
+    settings = _settings(mesh_encoding)
+    features = {
+        "expressions": {"neutral": 0.5, "happy": 0.8, "sad": 0.1},
+        "landmarks": np.zeros((468, 3))
+    }
+    return asyncio.run(PhotoProcessor(settings)._generate_realistic_animations(features))
+
+
+def test_fp16_keyframes_reference_blend_shapes_by_name():
+    animations = _animations("fp16")
+    keyframes = [keyframe for sequence in animations["sequences"] for keyframe in sequence["keyframes"]]
+
+    assert keyframes
+    assert all("blend_shapes" not in keyframe for keyframe in keyframes)
+    assert {keyframe["blend_shape"] for keyframe in keyframes} == {"neutral", "happy"}
+
+
+def test_json_keyframes_embed_blend_shape_deltas():
+    animations = _animations("json")
+    keyframes = [keyframe for sequence in animations["sequences"] for keyframe in sequence["keyframes"]]
+
+    assert all(len(keyframe["blend_shapes"]) == 468 * 3 for keyframe in keyframes)
+
+
+def test_fp16_applies_to_fallback_avatars():
+    gray = [value for index in range(256) for value in (index, index, index)]
+
+    avatar = asyncio.run(PhotoProcessor(_settings("fp16")).generate_3d_avatar(_palette_image(gray)))
+
+    assert avatar["generation_params"]["method"] == "fallback_processing"
+    assert avatar["vertices"] == [] and avatar["uvs"] == [] and avatar["blend_shapes"] == {}
+    assert set(avatar["mesh_buffers"]) == {"vertices", "uvs", "blend_shapes"}
@@ -0,0 +1,31 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from api.texture_store import TextureStore
+
+
+def _served_rgba(store, url):
+    return np.asarray(Image.open(io.BytesIO(store.get_png(url.rsplit("/", 1)[-1]))).convert("RGBA"))
+
+
+def test_palette_texture_is_served_with_its_own_colours():
+    image = Image.fromarray(np.arange(64 * 64, dtype=np.uint8).reshape(64, 64), 'P')
+    image.putpalette([255 - value for index in range(256) for value in (index, index, index)])
+    
+    store = TextureStore()
+    url = store.put("palette", image)
+    
+    assert np.array_equal(_served_rgba(store, url), np.asarray(image.convert("RGBA")))
+
+
+def test_palette_transparency_survives_storage():
+    image = Image.fromarray(np.arange(64 * 64, dtype=np.uint8).reshape(64, 64), 'P')
+    image.putpalette([value for index in range(256) for value in (index, index, index)])
+    image.info["transparency"] = 0
+    
+    store = TextureStore()
+    url = store.put("transparent", image)
+    
+    assert _served_rgba(store, url)[0, 0, 3] == 0